@@ -2,69 +2,124 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import gzip
+import hashlib
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from itertools import takewhile
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import Depends, FastAPI, HTTPException, Query, Response, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from auth import (
+    close_http_client,
     get_current_user,
     get_current_user_from_path,
-    get_current_user_optional,
     get_gitlab_authorization_url,
     handle_gitlab_callback,
+    optional_user,
 )
 from auth_db import (
+    create_or_reset_user_token,
+    get_user_token,
     init_auth_db,
+    list_user_tokens,
+    rotate_user_token,
 )
+from auth_db import delete_user as db_delete_user
 from config import (
     API_DESCRIPTION,
     API_TITLE,
     API_VERSION,
+    ARTICLE_RETENTION_DAYS,
+    LIST_PAGE_SIZE,
+    MAX_ITEMS_PER_RUN,
     MAX_PAGES_PER_RUN,
     MAX_RSS_ITEMS,
     MIN_SCRAPE_INTERVAL,
     OAUTH_ENABLED,
+    PRUNE_INTERVAL,
+    RATE_LIMIT_CLEANUP_INTERVAL,
     RATE_LIMIT_WINDOW_HOUR,
     RATE_LIMIT_WINDOW_SECOND,
+    READY_CHECK_CACHE_SECONDS,
     RSS_CACHE_MAX_AGE,
+    RSS_SHARED_CACHE_MAX_AGE,
+    RSS_STALE_WHILE_REVALIDATE,
     SCRAPE_INTERVAL,
     SERVER_HOST,
+    SERVER_LIMIT_CONCURRENCY,
     SERVER_PORT,
+    SERVER_TIMEOUT_KEEP_ALIVE,
     USER_RATE_LIMIT_PER_HOUR,
     USER_RATE_LIMIT_PER_SECOND,
 )
 from database import (
+    close_db_connections,
     current_timestamp_ms,
-    get_last_scrape_time,
-    get_recent_articles,
+    delete_articles_before,
+    get_cached_last_scrape_time,
+    get_max_publish_time,
     init_db,
     set_last_scrape_time,
 )
-from rate_limit import check_rate_limit
-from rss import generate_rss, validate_category_input
+from rate_limit import check_rate_limits, cleanup_rate_limit_store
+from rss import (
+    feed_etag,
+    feed_version,
+    get_cached_rss,
+    make_feed_key,
+    peek_cached_rss,
+    refresh_rss_cache,
+)
 from scraper import ArticleStateEnum, InfoTsinghuaScraper
 
-# Configure logging
+# Configure logging; records are formatted by the caller and written to stderr
+# from a listener thread so the event loop never blocks on log I/O
+_log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[QueueHandler(_log_queue)],
 )
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Initialize scheduler
 scheduler = AsyncIOScheduler()
 
+# Held for the duration of a scrape so runs never overlap, whoever triggers them
+_scrape_lock = threading.Lock()
+
+# Newest publish time listed by the last scrape that stored every item in full;
+# in memory only, so the first run after a restart always processes the list
+_scraped_through_ms: int | None = None
+
+
+def _scrape_articles_sync(scraper: InfoTsinghuaScraper) -> None:
+    """Scrape articles and save to database (blocking, run in a worker thread).
 
-async def scrape_articles() -> None:
-    """Scrape articles and save to database."""
+    Args:
+        scraper: Long-lived scraper owned by the application lifespan
+    """
     # Check if we scraped recently
-    last_scrape = get_last_scrape_time()
+    last_scrape = get_cached_last_scrape_time()
     now = current_timestamp_ms()
 
     if last_scrape:
@@ -75,10 +130,14 @@ async def scrape_articles() -> None:
             )
             return
 
+    global _scraped_through_ms
     logger.info("Starting scrape...")
 
+    # Whether any article was inserted or updated, even if the run fails later
+    stored_changes = False
     try:
-        with InfoTsinghuaScraper() as scraper:
+        # Entering the scraper refreshes its session cookies and CSRF token
+        with scraper, ThreadPoolExecutor(max_workers=1) as prefetcher:
             # Calculate cutoff time: last_scrape - scrape_interval
             # We stop processing when we reach articles older than this
             cutoff_time_ms = last_scrape - (SCRAPE_INTERVAL * 1000) if last_scrape else 0
@@ -89,47 +148,72 @@ async def scrape_articles() -> None:
             error_count = 0
             total_items = 0
 
-            # Fetch and process pages one at a time
+            # Process pages in order; the next page is fetched in the background
+            # while the current page's article details are being fetched
+            items = scraper.fetch_list_if_changed(lmid="all", page=1, page_size=LIST_PAGE_SIZE)
+            if items is None:
+                logger.info("List unchanged since last fetch, skipping scrape")
+                return
+
+            # Nothing newer than the last complete run saw: skip without moving
+            # last_scrape, so the next non-quiet run still rechecks this window.
+            # The database's newest article isn't enough, as a run that failed
+            # halfway may already have stored it
+            newest = max((item.get("fbsj", 0) for item in items), default=0)
+            if _scraped_through_ms is not None and newest <= _scraped_through_ms:
+                logger.info("No new items since %d, skipping scrape", _scraped_through_ms)
+                return
+            failed_details = scraper.failed_details
+
             for page in range(1, MAX_PAGES_PER_RUN + 1):
-                items = scraper.fetch_list(lmid="all", page=page, page_size=30)
                 if not items:
-                    logger.info(f"No more items on page {page}, stopping")
+                    logger.info("No more items on page %d, stopping", page)
+                    break
+
+                if items[0].get("fbsj", 0) < cutoff_time_ms:
+                    logger.info("Page %d starts before cutoff %d, stopping", page, cutoff_time_ms)
                     break
 
+                # The last page may only be partly within the per-run item budget
+                items = items[: MAX_ITEMS_PER_RUN - total_items]
                 total_items += len(items)
-                logger.info(f"Fetched page {page}: {len(items)} items")
-
-                for item in items:
-                    # Check if article publish time is before cutoff
-                    publish_time = item.get("fbsj", 0)
-                    if publish_time < cutoff_time_ms:
-                        logger.info(
-                            f"Reached article {item.get('xxid')} with publish_time {publish_time} < cutoff {cutoff_time_ms}, stopping"
-                        )
-                        break
-
-                    try:
-                        # Insert or update article using scraper method
-                        state = scraper.upsert_article(item)
-                        if state == ArticleStateEnum.NEW:
-                            new_count += 1
-                        elif state == ArticleStateEnum.UPDATED:
-                            updated_count += 1
-                        else:
-                            skipped_count += 1
-                    except (ValueError, KeyError) as e:
-                        # Skip items with missing required fields
-                        error_count += 1
-                        logger.warning(
-                            f"Skipping item {item.get('xxid', 'UNKNOWN')} due to error: {e}"
-                        )
-                        continue
-                else:
-                    # Continue to next page if inner loop didn't break
-                    continue
-
-                # Break outer loop if inner loop broke (reached cutoff)
-                break
+                logger.info("Fetched page %d: %d items", page, len(items))
+
+                # Only prefetch when the next page is certainly needed, i.e. even the
+                # oldest item on this page is still newer than the cutoff
+                next_page: Future[list[dict[str, Any]]] | None = None
+                if page < MAX_PAGES_PER_RUN and items[-1].get("fbsj", 0) >= cutoff_time_ms:
+                    next_page = prefetcher.submit(
+                        scraper.fetch_list, lmid="all", page=page + 1, page_size=LIST_PAGE_SIZE
+                    )
+
+                # Keep items up to the cutoff (the list is ordered newest first)
+                page_items = list(
+                    takewhile(lambda item: item.get("fbsj", 0) >= cutoff_time_ms, items)
+                )
+                reached_cutoff = len(page_items) < len(items)
+                if reached_cutoff:
+                    item = items[len(page_items)]
+                    logger.info(
+                        "Reached article %s with publish_time %s < cutoff %d, stopping",
+                        item.get("xxid"),
+                        item.get("fbsj", 0),
+                        cutoff_time_ms,
+                    )
+
+                # Insert or update the whole page in one transaction
+                states, page_errors = scraper.upsert_articles_bulk(page_items)
+                new_count += states.count(ArticleStateEnum.NEW)
+                updated_count += states.count(ArticleStateEnum.UPDATED)
+                skipped_count += states.count(ArticleStateEnum.SKIPPED)
+                error_count += page_errors
+                if len(states) > states.count(ArticleStateEnum.SKIPPED):
+                    stored_changes = True
+
+                if reached_cutoff or next_page is None:
+                    break
+
+                items = next_page.result()
 
             logger.info(
                 f"Fetched {total_items} items total. Saved {new_count} new articles, updated {updated_count} existing articles, skipped {skipped_count} existing, {error_count} errors"
@@ -140,9 +224,73 @@ async def scrape_articles() -> None:
             set_last_scrape_time(scrape_end_time)
             logger.info("Updated last scrape timestamp")
 
+            # Only a run that stored every article with its content may let an
+            # unchanged or quiet list skip the next scrape
+            if scraper.failed_details == failed_details:
+                scraper.mark_lists_processed()
+                _scraped_through_ms = newest
+
     except Exception as e:
         logger.error(f"Error during scrape: {e}", exc_info=True)
 
+    finally:
+        # Re-render feeds now so requests don't pay for it after each scrape. A run
+        # that failed partway still needs it: its stored rows need a new version
+        if stored_changes:
+            try:
+                refresh_rss_cache(limit=MAX_RSS_ITEMS)
+            except Exception as e:
+                logger.error("Error refreshing RSS cache: %s", e, exc_info=True)
+
+
+async def scrape_articles(scraper: InfoTsinghuaScraper) -> None:
+    """Scrape articles without blocking the event loop.
+
+    The scraper and SQLite calls are synchronous, so the work is offloaded to a
+    thread to keep /rss and /health responsive while a scrape is running.
+
+    Args:
+        scraper: Long-lived scraper owned by the application lifespan
+    """
+    if not _scrape_lock.acquire(blocking=False):
+        logger.info("Previous scrape still running, skipping")
+        return
+
+    try:
+        await asyncio.to_thread(_scrape_articles_sync, scraper)
+    finally:
+        _scrape_lock.release()
+
+
+def _prune_articles_sync() -> None:
+    """Delete articles older than the retention period (blocking)."""
+    cutoff_ms = current_timestamp_ms() - ARTICLE_RETENTION_DAYS * 24 * 60 * 60 * 1000
+    deleted = delete_articles_before(cutoff_ms)
+    if deleted:
+        logger.info("Pruned %d articles older than %d days", deleted, ARTICLE_RETENTION_DAYS)
+
+        # Cached feeds (and their validators) may still list the pruned articles
+        refresh_rss_cache(limit=MAX_RSS_ITEMS)
+
+
+async def prune_articles() -> None:
+    """Prune old articles without blocking the event loop."""
+    try:
+        await asyncio.to_thread(_prune_articles_sync)
+    except Exception as e:
+        logger.error("Error during prune: %s", e, exc_info=True)
+
+
+async def cleanup_rate_limits() -> None:
+    """Forget rate limit counters of idle users.
+
+    Runs on the event loop like the request handlers that update the counters,
+    so it needs no locking.
+    """
+    removed = cleanup_rate_limit_store()
+    if removed:
+        logger.info("Dropped rate limit counters for %d idle users", removed)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -152,18 +300,39 @@ async def lifespan(app: FastAPI):
     init_auth_db()
     logger.info("Database initialized")
 
-    # Start scheduler
+    app.state.scraper = InfoTsinghuaScraper()
+
+    # Start scheduler; the first run fires immediately so startup doesn't wait on it
     scheduler.add_job(
         scrape_articles,
         "interval",
+        args=[app.state.scraper],
         seconds=SCRAPE_INTERVAL,
         id="scrape_articles",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=SCRAPE_INTERVAL // 2,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    if ARTICLE_RETENTION_DAYS > 0:
+        scheduler.add_job(
+            prune_articles,
+            "interval",
+            seconds=PRUNE_INTERVAL,
+            id="prune_articles",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    scheduler.add_job(
+        cleanup_rate_limits,
+        "interval",
+        seconds=RATE_LIMIT_CLEANUP_INTERVAL,
+        id="cleanup_rate_limits",
+        replace_existing=True,
+        coalesce=True,
     )
-
-    # Run initial scrape
-    await scrape_articles()
-
     scheduler.start()
     logger.info(f"Scheduler started, scraping every {SCRAPE_INTERVAL} seconds")
 
@@ -171,6 +340,9 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     scheduler.shutdown()
+    app.state.scraper.close()
+    await close_http_client()
+    close_db_connections()
     logger.info("Scheduler shutdown")
 
 
@@ -182,26 +354,50 @@ app = FastAPI(
 )
 
 
+@functools.cache
+def _load_tokens_page() -> tuple[bytes, bytes, str] | None:
+    """Read and compress the token management page once; it doesn't change at runtime.
+
+    Returns:
+        Tuple of (HTML bytes, gzip-compressed HTML, ETag), or None if the template
+        is missing
+    """
+    html_path = Path(__file__).parent / "templates" / "tokens.html"
+    if not html_path.exists():
+        return None
+
+    html_content = html_path.read_bytes()
+    html_gzip = gzip.compress(html_content, compresslevel=9, mtime=0)
+    return html_content, html_gzip, f'"{hashlib.blake2b(html_content, digest_size=8).hexdigest()}"'
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root(
-    current_user: dict[str, Any] | None = Depends(get_current_user_optional),
+    request: Request,
+    current_user: dict[str, Any] | None = Depends(optional_user),
 ) -> Response:
     """Root endpoint serving token management HTML."""
-    html_path = Path(__file__).parent / "templates" / "tokens.html"
-
-    if not html_path.exists():
+    page = _load_tokens_page()
+    if page is None:
         return Response(
             content="<h1>Info Tsinghua RSS Feed</h1><p>Templates not found</p>",
             media_type="text/html",
         )
 
-    html_content = html_path.read_text(encoding="utf-8")
-    return Response(content=html_content, media_type="text/html")
+    html_content, html_gzip, etag = page
+    # Revalidate every time so a redeployed page is picked up immediately
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if _accepts_gzip(request):
+        html_content = html_gzip
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=html_content, media_type="text/html", headers=headers)
 
 
 @app.get("/api/status")
 async def api_status(
-    current_user: dict[str, Any] | None = Depends(get_current_user_optional),
+    current_user: dict[str, Any] | None = Depends(optional_user),
 ) -> dict[str, Any]:
     """API status endpoint for frontend authentication check."""
     response = {
@@ -236,6 +432,18 @@ async def login():
     return RedirectResponse(auth_url)
 
 
+def _get_or_create_token(user_id: int) -> str:
+    """Get the user's existing token, creating one if needed (blocking).
+
+    Args:
+        user_id: User database ID
+
+    Returns:
+        Auth token
+    """
+    return get_user_token(user_id) or create_or_reset_user_token(user_id)
+
+
 @app.get("/auth/callback")
 async def callback(code: str, state: str):
     """Handle GitLab OAuth callback and redirect to GUI."""
@@ -247,14 +455,7 @@ async def callback(code: str, state: str):
 
     result = await handle_gitlab_callback(code, state)
 
-    # Get existing token for user
-    from auth_db import create_or_reset_user_token, get_user_token
-
-    token = get_user_token(result["user_id"])
-
-    if not token:
-        # Create a new token
-        token = create_or_reset_user_token(result["user_id"])
+    token = await asyncio.to_thread(_get_or_create_token, result["user_id"])
 
     # Redirect to frontend with token as query parameter
     return RedirectResponse(url=f"/?token={token}&new=true")
@@ -270,8 +471,6 @@ async def list_tokens(
     current_user: dict[str, Any] = Depends(get_current_user),
 ) -> list[dict[str, Any]]:
     """List all tokens for the current user."""
-    from auth_db import list_user_tokens
-
     tokens = list_user_tokens(current_user["user_id"])
 
     return tokens
@@ -282,9 +481,7 @@ async def rotate_token(
     current_user: dict[str, Any] = Depends(get_current_user_from_path),
 ) -> dict[str, str]:
     """Rotate an auth token (create new, delete old)."""
-    from auth_db import rotate_user_token
-
-    new_token = rotate_user_token(current_user["user_id"])
+    new_token = await asyncio.to_thread(rotate_user_token, current_user["user_id"])
 
     if not new_token:
         raise HTTPException(
@@ -304,9 +501,7 @@ async def delete_user(
     current_user: dict[str, Any] = Depends(get_current_user),
 ) -> dict[str, str]:
     """Delete the current user and all associated data."""
-    from auth_db import delete_user
-
-    deleted = delete_user(current_user["user_id"])
+    deleted = await asyncio.to_thread(db_delete_user, current_user["user_id"])
 
     if not deleted:
         raise HTTPException(
@@ -322,15 +517,99 @@ async def delete_user(
 # =============================================================================
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against the current ETag.
+
+    The header may list several tags and is compared weakly, so proxies that add
+    or drop W/ still match.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def _is_not_modified(request: Request, etag: str, last_modified_ms: int) -> bool:
+    """Check conditional request headers against the current feed version.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the feed
+        last_modified_ms: Last modification time in milliseconds
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if "if-none-match" in request.headers:
+        # If-None-Match takes precedence over If-Modified-Since
+        return _etag_matches(request, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    # HTTP dates have second precision
+    return last_modified_ms // 1000 <= since.timestamp()
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Check whether the client accepts a gzip-encoded response.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        True if gzip (or, failing an explicit gzip entry, "*") is listed in
+        Accept-Encoding and not refused with q=0
+    """
+    # Quality of the gzip and "*" entries; an explicit gzip entry wins over "*"
+    qualities: dict[str, float] = {}
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, *params = coding.split(";")
+        name = name.strip().lower()
+        if name not in ("gzip", "*"):
+            continue
+
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
 @app.get("/rss")
 async def rss_feed(
+    request: Request,
     category_in: list[str] | None = Query(
         None, description="Categories to filter in (only these categories)"
     ),
     category_not_in: list[str] | None = Query(
         None, alias="not_in", description="Categories to filter out (exclude these categories)"
     ),
-    current_user: dict[str, Any] | None = Depends(get_current_user_optional),
+    current_user: dict[str, Any] | None = Depends(optional_user),
 ) -> Response:
     """Generate and return RSS feed (requires authentication).
 
@@ -357,13 +636,16 @@ async def rss_feed(
     remaining_hour = USER_RATE_LIMIT_PER_HOUR
 
     if current_user:
-        user_id = current_user["user_id"]
-
-        # Check per-second rate limit
-        allowed_second, remaining_second = check_rate_limit(
-            user_id=user_id,
-            window_seconds=RATE_LIMIT_WINDOW_SECOND,
-            max_requests=USER_RATE_LIMIT_PER_SECOND,
+        # Check the per-second and per-hour limits together
+        (
+            (allowed_second, remaining_second, retry_second),
+            (allowed_hour, remaining_hour, retry_hour),
+        ) = check_rate_limits(
+            current_user["user_id"],
+            [
+                (RATE_LIMIT_WINDOW_SECOND, USER_RATE_LIMIT_PER_SECOND),
+                (RATE_LIMIT_WINDOW_HOUR, USER_RATE_LIMIT_PER_HOUR),
+            ],
         )
 
         if not allowed_second:
@@ -375,17 +657,10 @@ async def rss_feed(
                     "X-RateLimit-Remaining-Second": "0",
                     "X-RateLimit-Limit-Hour": str(USER_RATE_LIMIT_PER_HOUR),
                     "X-RateLimit-Remaining-Hour": str(remaining_hour),
-                    "Retry-After": "1",
+                    "Retry-After": str(retry_second),
                 },
             )
 
-        # Check per-hour rate limit
-        allowed_hour, remaining_hour = check_rate_limit(
-            user_id=user_id,
-            window_seconds=RATE_LIMIT_WINDOW_HOUR,
-            max_requests=USER_RATE_LIMIT_PER_HOUR,
-        )
-
         if not allowed_hour:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -395,24 +670,44 @@ async def rss_feed(
                     "X-RateLimit-Remaining-Second": str(remaining_second),
                     "X-RateLimit-Limit-Hour": str(USER_RATE_LIMIT_PER_HOUR),
                     "X-RateLimit-Remaining-Hour": "0",
-                    "Retry-After": "3600",
+                    "Retry-After": str(retry_hour),
                 },
             )
 
     # Validate category inputs
-    category_in = validate_category_input(category_in)
-    category_not_in = validate_category_input(category_not_in)
-
-    rss_xml = generate_rss(
-        limit=MAX_RSS_ITEMS,
-        categories_in=category_in,
-        categories_not_in=category_not_in,
-    )
+    try:
+        feed_key = make_feed_key(
+            limit=MAX_RSS_ITEMS,
+            categories_in=category_in,
+            categories_not_in=category_not_in,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
+    # Token-authenticated feeds must never be stored by shared caches; the public
+    # feed can be served entirely by a reverse proxy
+    if current_user:
+        cache_control = f"private, max-age={RSS_CACHE_MAX_AGE}"
+    else:
+        cache_control = (
+            f"public, max-age={RSS_CACHE_MAX_AGE}, s-maxage={RSS_SHARED_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={RSS_STALE_WHILE_REVALIDATE}"
+        )
     response_headers = {
-        "Cache-Control": f"public, max-age={RSS_CACHE_MAX_AGE}",
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
     }
 
+    # The feed only changes when the database is updated; the version is advanced
+    # only once the cached feeds have been re-rendered
+    version = feed_version()
+    etag = feed_etag(feed_key, version)
+    response_headers["ETag"] = etag
+    response_headers["Last-Modified"] = formatdate(version / 1000, usegmt=True)
+
     # Add rate limit headers if authenticated
     if current_user:
         response_headers.update(
@@ -424,6 +719,20 @@ async def rss_feed(
             }
         )
 
+    # Client already has the current feed, skip rendering entirely
+    if _is_not_modified(request, etag, version):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+
+    # Cache hits are a dict lookup; a miss renders in a worker thread so the event
+    # loop keeps serving other requests meanwhile
+    rendered = peek_cached_rss(feed_key)
+    if rendered is None:
+        rendered = await asyncio.to_thread(get_cached_rss, feed_key)
+    rss_xml, rss_gzip = rendered
+    if _accepts_gzip(request):
+        rss_xml = rss_gzip
+        response_headers["Content-Encoding"] = "gzip"
+
     return Response(
         content=rss_xml,
         media_type="application/rss+xml; charset=utf-8",
@@ -431,14 +740,64 @@ async def rss_feed(
     )
 
 
+_HEALTH_BODY = b'{"status":"healthy"}'
+
+# Last readiness probe: (monotonic expiry, database reachable)
+_ready_state: tuple[float, bool] = (0.0, False)
+
+
+def _database_reachable() -> bool:
+    """Run a minimal query against the articles database (blocking).
+
+    Returns:
+        True if the query succeeded
+    """
+    try:
+        # Index-only MAX(); touches the articles table without reading any content
+        get_max_publish_time()
+    except Exception as e:
+        logger.warning("Readiness check failed: %s", e)
+        return False
+    return True
+
+
 @app.get("/health")
-async def health() -> dict[str, str]:
-    """Health check endpoint."""
-    _ = get_recent_articles(limit=1)
-    return {"status": "healthy"}
+async def health() -> Response:
+    """Liveness check; answers as long as the process is serving requests."""
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+@app.get("/ready")
+async def ready() -> Response:
+    """Readiness check; verifies the database is reachable.
+
+    The probe result is reused for READY_CHECK_CACHE_SECONDS so frequent probes
+    don't turn into database load.
+    """
+    global _ready_state
+    expires_at, reachable = _ready_state
+    if expires_at <= time.monotonic():
+        reachable = await asyncio.to_thread(_database_reachable)
+        _ready_state = (time.monotonic() + READY_CHECK_CACHE_SECONDS, reachable)
+
+    if not reachable:
+        return Response(
+            content=b'{"status":"unavailable"}',
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            media_type="application/json",
+        )
+    return Response(content=b'{"status":"ready"}', media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
+    # Single worker on purpose: OAuth states, rate limits, the feed cache and the
+    # scrape scheduler all live in process memory
+    uvicorn.run(
+        app,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY,
+        timeout_keep_alive=SERVER_TIMEOUT_KEEP_ALIVE,
+    )
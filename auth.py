@@ -2,31 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
+from urllib.parse import quote, urlencode
 
 import httpx
 from fastapi import HTTPException, Query, status
 
 from auth_db import (
     create_or_update_user,
+    peek_auth_token,
     validate_auth_token,
 )
 from config import (
     GITLAB_CLIENT_ID,
     GITLAB_CLIENT_SECRET,
+    GITLAB_HTTP_CONNECT_TIMEOUT,
+    GITLAB_HTTP_KEEPALIVE_EXPIRY,
+    GITLAB_HTTP_TIMEOUT,
     GITLAB_REDIRECT_URI,
     GITLAB_SCOPES,
     GITLAB_URL,
+    OAUTH_ENABLED,
+    OAUTH_STATE_MAX_ENTRIES,
+    OAUTH_STATE_TTL,
     SESSION_SECRET,
 )
 
+logger = logging.getLogger(__name__)
+
+# HTTP client shared by all OAuth calls so connections to GitLab are kept alive
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared GitLab HTTP client, creating it on first use.
+
+    Returns:
+        Pooled async HTTP client
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(GITLAB_HTTP_TIMEOUT, connect=GITLAB_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=GITLAB_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared GitLab HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class OAuthStateManager:
     """Manage OAuth state parameters for CSRF protection."""
 
     def __init__(self) -> None:
-        self._states: dict[str, Any] = {}
+        # state -> (expires_at, redirect_path), oldest first
+        self._states: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
 
     def generate_state(self, redirect_path: str = "/") -> str:
         """Generate a secure state token.
@@ -41,7 +88,9 @@ class OAuthStateManager:
             raise ValueError("SESSION_SECRET must be configured")
 
         state = secrets.token_urlsafe(32)
-        self._states[state] = {"redirect_path": redirect_path}
+        with self._lock:
+            self._states[state] = (time.monotonic() + OAUTH_STATE_TTL, redirect_path)
+            self._evict()
         return state
 
     def validate_state(self, state: str) -> str | None:
@@ -53,23 +102,55 @@ class OAuthStateManager:
         Returns:
             Redirect path if valid, None otherwise
         """
-        return self._states.pop(state, None)
+        with self._lock:
+            entry = self._states.pop(state, None)
 
-    def cleanup_old_states(self, max_age_seconds: int = 600) -> None:
-        """Clean up old states (should be called periodically).
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
 
-        Args:
-            max_age_seconds: Maximum age of state tokens
+    def cleanup_old_states(self) -> None:
+        """Drop expired states."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired states and enforce the size bound (caller holds the lock).
+
+        States share one TTL, so insertion order is expiry order and only the head
+        ever needs checking.
         """
-        # Simple implementation: just clear all states
-        # In production, you'd want to track timestamps
-        if len(self._states) > 1000:
-            self._states.clear()
+        now = time.monotonic()
+        while self._states and (
+            len(self._states) > OAUTH_STATE_MAX_ENTRIES
+            or next(iter(self._states.values()))[0] < now
+        ):
+            self._states.popitem(last=False)
 
 
 oauth_state_manager = OAuthStateManager()
 
 
+# GitLab endpoints; everything except the per-login state is fixed, so the
+# authorize query is encoded once
+_GITLAB_BASE_URL = GITLAB_URL.rstrip("/")
+_AUTHORIZE_URL = f"{_GITLAB_BASE_URL}/oauth/authorize"
+_TOKEN_URL = f"{_GITLAB_BASE_URL}/oauth/token"
+_USERINFO_URL = f"{_GITLAB_BASE_URL}/oauth/userinfo"
+_AUTHORIZE_QUERY = urlencode(
+    {
+        "client_id": GITLAB_CLIENT_ID,
+        "redirect_uri": GITLAB_REDIRECT_URI,
+        "response_type": "code",
+        "scope": " ".join(GITLAB_SCOPES),
+    },
+    quote_via=quote,
+)
+
+# Characters of a GitLab error response kept for logs and error details
+_ERROR_BODY_LIMIT = 512
+
+
 def get_gitlab_authorization_url(redirect_path: str = "/") -> str:
     """Generate GitLab OAuth authorization URL.
 
@@ -80,21 +161,7 @@ def get_gitlab_authorization_url(redirect_path: str = "/") -> str:
         Authorization URL
     """
     state = oauth_state_manager.generate_state(redirect_path)
-
-    base_url = GITLAB_URL.rstrip("/")
-    auth_url = f"{base_url}/oauth/authorize"
-
-    params = {
-        "client_id": GITLAB_CLIENT_ID,
-        "redirect_uri": GITLAB_REDIRECT_URI,
-        "response_type": "code",
-        "state": state,
-        "scope": " ".join(GITLAB_SCOPES),
-    }
-
-    # Build URL with params
-    query_string = "&".join(f"{k}={v}" for k, v in params.items())
-    return f"{auth_url}?{query_string}"
+    return f"{_AUTHORIZE_URL}?{_AUTHORIZE_QUERY}&state={quote(state, safe='')}"
 
 
 async def exchange_gitlab_code(code: str) -> dict[str, Any]:
@@ -109,8 +176,6 @@ async def exchange_gitlab_code(code: str) -> dict[str, Any]:
     Raises:
         HTTPException: If token exchange fails
     """
-    token_url = f"{GITLAB_URL.rstrip('/')}/oauth/token"
-
     data = {
         "client_id": GITLAB_CLIENT_ID,
         "client_secret": GITLAB_CLIENT_SECRET,
@@ -119,15 +184,14 @@ async def exchange_gitlab_code(code: str) -> dict[str, Any]:
         "redirect_uri": GITLAB_REDIRECT_URI,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(token_url, data=data)
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to exchange authorization code",
-            )
+    response = await _get_http_client().post(_TOKEN_URL, data=data)
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to exchange authorization code",
+        )
 
-        return response.json()
+    return response.json()
 
 
 async def get_gitlab_user_info(access_token: str) -> dict[str, Any]:
@@ -142,21 +206,19 @@ async def get_gitlab_user_info(access_token: str) -> dict[str, Any]:
     Raises:
         HTTPException: If user info request fails
     """
-    userinfo_url = f"{GITLAB_URL.rstrip('/')}/oauth/userinfo"
-
     headers = {"Authorization": f"Bearer {access_token}"}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(userinfo_url, headers=headers)
-        if response.status_code != 200:
-            print(f"Failed to fetch user info: {response.status_code}")
-            print(f"Response: {response.text}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch user info: {response.text}",
-            )
+    response = await _get_http_client().get(_USERINFO_URL, headers=headers)
+    if response.status_code != 200:
+        # Error pages can be large; only the start is useful
+        body = response.text[:_ERROR_BODY_LIMIT]
+        logger.warning("Failed to fetch user info: %s %s", response.status_code, body)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to fetch user info: {body}",
+        )
 
-        return response.json()
+    return response.json()
 
 
 async def handle_gitlab_callback(code: str, state: str) -> dict[str, Any]:
@@ -193,8 +255,8 @@ async def handle_gitlab_callback(code: str, state: str) -> dict[str, Any]:
     # Get user info
     user_info = await get_gitlab_user_info(access_token)
 
-    # Create or update user
-    user_id = create_or_update_user(user_info)
+    # Create or update user; the write may wait on the scraper's write lock
+    user_id = await asyncio.to_thread(create_or_update_user, user_info)
 
     return {
         "user_id": user_id,
@@ -202,7 +264,25 @@ async def handle_gitlab_callback(code: str, state: str) -> dict[str, Any]:
     }
 
 
-def get_current_user_optional(
+async def _lookup_token(token: str) -> dict[str, Any] | None:
+    """Resolve a token to its user, going to the database only on a cache miss.
+
+    Dependencies run on every authenticated request; cached tokens are answered
+    on the event loop and misses are validated in a worker thread.
+
+    Args:
+        token: API token
+
+    Returns:
+        User dictionary if valid token, None otherwise
+    """
+    user_data = peek_auth_token(token)
+    if user_data is None:
+        user_data = await asyncio.to_thread(validate_auth_token, token)
+    return user_data
+
+
+async def get_current_user_optional(
     token: str | None = Query(None),
 ) -> dict[str, Any] | None:
     """Get current user from token (optional).
@@ -216,7 +296,21 @@ def get_current_user_optional(
     if not token:
         return None
 
-    return validate_auth_token(token)
+    return await _lookup_token(token)
+
+
+async def get_anonymous_user() -> None:
+    """Stand-in for get_current_user_optional when OAuth is disabled.
+
+    Returns:
+        Always None; no token is parsed or looked up
+    """
+    return None
+
+
+# Without OAuth the feed is open, so there is no user to look up or rate limit;
+# the choice is made once here instead of on every request
+optional_user = get_current_user_optional if OAUTH_ENABLED else get_anonymous_user
 
 
 async def get_current_user(
@@ -233,7 +327,7 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or missing
     """
-    user_data = validate_auth_token(token)
+    user_data = await _lookup_token(token)
 
     if not user_data:
         raise HTTPException(
@@ -256,7 +350,7 @@ async def get_current_user_from_path(token: str) -> dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or missing
     """
-    user_data = validate_auth_token(token)
+    user_data = await _lookup_token(token)
 
     if not user_data:
         raise HTTPException(
@@ -2,39 +2,163 @@
 
 from __future__ import annotations
 
+import logging
+import sqlite3
+import threading
+import time
 import uuid
 from typing import Any
 
-from database import current_timestamp_ms, get_db_connection
+from config import AUTH_TOKEN_CACHE_MAX_ENTRIES, AUTH_TOKEN_CACHE_TTL
+from database import current_timestamp_ms, get_db_connection, get_read_connection
+
+logger = logging.getLogger(__name__)
+
+# Recently validated tokens: token -> (expires_at, user dict)
+_token_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+_token_cache_lock = threading.Lock()
+_token_cache_generation = 0
+
+
+def _invalidate_user_tokens(user_id: int) -> None:
+    """Drop cached validations for a user after their token changes.
+
+    Args:
+        user_id: User database ID
+    """
+    global _token_cache_generation
+    with _token_cache_lock:
+        _token_cache_generation += 1
+        for token, (_, user) in list(_token_cache.items()):
+            if user["user_id"] == user_id:
+                del _token_cache[token]
+
+
+_UPSERT_USER_SQL = """
+    INSERT INTO users (gitlab_id, username, email, name, avatar_url, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(gitlab_id) DO UPDATE SET
+        username = excluded.username,
+        email = excluded.email,
+        name = excluded.name,
+        avatar_url = excluded.avatar_url,
+        updated_at = excluded.updated_at
+    RETURNING id
+"""
+
+_SELECT_USER_SQL = """
+    SELECT id, gitlab_id, username, email, name, avatar_url, token, token_last_used_at, created_at, updated_at
+    FROM users
+"""
+_SELECT_USER_BY_ID_SQL = _SELECT_USER_SQL + "WHERE id = ?"
+_SELECT_USER_BY_GITLAB_ID_SQL = _SELECT_USER_SQL + "WHERE gitlab_id = ?"
+
+# Record the use and fetch the user in one statement
+_VALIDATE_TOKEN_SQL = """
+    UPDATE users SET token_last_used_at = ?
+    WHERE token = ?
+    RETURNING id, gitlab_id, username, email, name, avatar_url
+"""
+
+
+def _token_key(token: str) -> bytes | None:
+    """Convert a token to the 16-byte form stored in the database.
+
+    Tokens are handed out as UUID strings but stored as raw bytes, which keeps
+    the unique token index less than half the size. Only the canonical spelling
+    is accepted, so each token has exactly one valid form (and one cache entry).
+
+    Args:
+        token: Auth token UUID string
+
+    Returns:
+        UUID bytes, or None if the token is not a canonical UUID string
+    """
+    try:
+        parsed = uuid.UUID(token)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if str(parsed) != token:
+        return None
+    return parsed.bytes
+
+
+def _token_str(token_key: bytes) -> str:
+    """Convert a stored token back to the UUID string given to users.
+
+    Args:
+        token_key: Token bytes from the database
+
+    Returns:
+        Auth token UUID string
+    """
+    return str(uuid.UUID(bytes=token_key))
+
+
+def _user_from_row(row: sqlite3.Row) -> dict[str, Any]:
+    """Convert a users row to a dictionary with the token as a UUID string.
+
+    Args:
+        row: Row from the users table
+
+    Returns:
+        User dictionary
+    """
+    user = dict(row)
+    if user["token"] is not None:
+        user["token"] = _token_str(user["token"])
+    return user
+
+
+# Applied as one script in a single transaction
+_AUTH_SCHEMA = """
+    BEGIN;
+
+    -- Users table with token column
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        gitlab_id TEXT UNIQUE NOT NULL,
+        username TEXT NOT NULL,
+        email TEXT NOT NULL,
+        name TEXT,
+        avatar_url TEXT,
+        token BLOB UNIQUE,
+        token_last_used_at INTEGER,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    );
+
+    -- gitlab_id and token are indexed by their UNIQUE constraints; drop the
+    -- duplicate indexes older databases were created with
+    DROP INDEX IF EXISTS idx_users_gitlab_id;
+    DROP INDEX IF EXISTS idx_users_token;
+
+    -- Rate limits are counted in memory (rate_limit.py); drop the old table
+    DROP TABLE IF EXISTS rate_limit_tracking;
+
+    -- Tokens live on the users row; the separate token table is no longer read
+    DROP TABLE IF EXISTS auth_tokens;
+
+    COMMIT;
+"""
 
 
 def init_auth_db() -> None:
     """Initialize authentication-related database tables."""
     with get_db_connection() as conn:
-        # Users table with token column
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                gitlab_id TEXT UNIQUE NOT NULL,
-                username TEXT NOT NULL,
-                email TEXT NOT NULL,
-                name TEXT,
-                avatar_url TEXT,
-                token TEXT UNIQUE,
-                token_last_used_at INTEGER,
-                created_at INTEGER NOT NULL,
-                updated_at INTEGER NOT NULL
-            )
-        """)
-
-        # Create indexes
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_users_gitlab_id ON users(gitlab_id)
-        """)
-
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_users_token ON users(token)
-        """)
+        conn.executescript(_AUTH_SCHEMA)
+
+        # Tokens used to be stored as UUID text; convert them to the 16-byte form.
+        # A malformed one could never be presented successfully, so it is cleared
+        # and the user gets a new token on their next login
+        legacy = conn.execute("SELECT id, token FROM users WHERE typeof(token) = 'text'")
+        converted = []
+        for row in legacy.fetchall():
+            token_key = _token_key(row["token"])
+            if token_key is None:
+                logger.warning("Clearing malformed auth token of user %d", row["id"])
+            converted.append((token_key, row["id"]))
+        conn.executemany("UPDATE users SET token = ? WHERE id = ?", converted)
 
         conn.commit()
 
@@ -55,22 +179,17 @@ def create_or_update_user(gitlab_user: dict[str, Any]) -> int:
     """
     now = current_timestamp_ms()
 
+    # OpenID Connect sends sub as a string already
+    gitlab_id = gitlab_user["sub"]
+    if not isinstance(gitlab_id, str):
+        gitlab_id = str(gitlab_id)
+
     with get_db_connection() as conn:
         # Try to insert or update
         cursor = conn.execute(
-            """
-            INSERT INTO users (gitlab_id, username, email, name, avatar_url, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(gitlab_id) DO UPDATE SET
-                username = excluded.username,
-                email = excluded.email,
-                name = excluded.name,
-                avatar_url = excluded.avatar_url,
-                updated_at = excluded.updated_at
-            RETURNING id
-            """,
+            _UPSERT_USER_SQL,
             (
-                str(gitlab_user["sub"]),
+                gitlab_id,
                 gitlab_user.get("nickname") or gitlab_user.get("preferred_username", ""),
                 gitlab_user.get("email", ""),
                 gitlab_user.get("name"),
@@ -94,18 +213,11 @@ def get_user_by_id(user_id: int) -> dict[str, Any] | None:
     Returns:
         User dictionary or None if not found
     """
-    with get_db_connection() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id, gitlab_id, username, email, name, avatar_url, token, token_last_used_at, created_at, updated_at
-            FROM users
-            WHERE id = ?
-            """,
-            (user_id,),
-        )
+    with get_read_connection() as conn:
+        cursor = conn.execute(_SELECT_USER_BY_ID_SQL, (user_id,))
         row = cursor.fetchone()
 
-        return dict(row) if row else None
+    return _user_from_row(row) if row else None
 
 
 def get_user_by_gitlab_id(gitlab_id: str) -> dict[str, Any] | None:
@@ -117,18 +229,11 @@ def get_user_by_gitlab_id(gitlab_id: str) -> dict[str, Any] | None:
     Returns:
         User dictionary or None if not found
     """
-    with get_db_connection() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id, gitlab_id, username, email, name, avatar_url, token, token_last_used_at, created_at, updated_at
-            FROM users
-            WHERE gitlab_id = ?
-            """,
-            (gitlab_id,),
-        )
+    with get_read_connection() as conn:
+        cursor = conn.execute(_SELECT_USER_BY_GITLAB_ID_SQL, (gitlab_id,))
         row = cursor.fetchone()
 
-        return dict(row) if row else None
+    return _user_from_row(row) if row else None
 
 
 def create_or_reset_user_token(user_id: int) -> str:
@@ -141,7 +246,7 @@ def create_or_reset_user_token(user_id: int) -> str:
         The generated token UUID
     """
     # Generate token
-    token = str(uuid.uuid4())
+    token = uuid.uuid4()
     now = current_timestamp_ms()
 
     with get_db_connection() as conn:
@@ -151,11 +256,12 @@ def create_or_reset_user_token(user_id: int) -> str:
             SET token = ?, token_last_used_at = ?, updated_at = ?
             WHERE id = ?
             """,
-            (token, None, now, user_id),
+            (token.bytes, None, now, user_id),
         )
         conn.commit()
 
-    return token
+    _invalidate_user_tokens(user_id)
+    return str(token)
 
 
 def get_user_token(user_id: int) -> str | None:
@@ -167,55 +273,79 @@ def get_user_token(user_id: int) -> str | None:
     Returns:
         Token string or None if not set
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(
             "SELECT token FROM users WHERE id = ?",
             (user_id,),
         )
         row = cursor.fetchone()
 
-        return row["token"] if row else None
+        return _token_str(row["token"]) if row and row["token"] else None
+
+
+def peek_auth_token(token: str) -> dict[str, Any] | None:
+    """Look up a token in the validation cache without touching the database.
+
+    Args:
+        token: Auth token UUID
+
+    Returns:
+        Dictionary with user_id and user data if cached and fresh, None otherwise
+    """
+    cached = _token_cache.get(token)
+    if cached and cached[0] > time.monotonic():
+        return dict(cached[1])
+    return None
 
 
 def validate_auth_token(token: str) -> dict[str, Any] | None:
     """Validate an auth token and return associated user.
 
+    Valid tokens are cached for AUTH_TOKEN_CACHE_TTL seconds, so a feed reader
+    polling with the same token costs one lookup (and one last-used write) per TTL.
+
     Args:
         token: Auth token UUID
 
     Returns:
         Dictionary with user_id and user data if valid, None otherwise
     """
+    cached = peek_auth_token(token)
+    if cached is not None:
+        return cached
+
+    token_key = _token_key(token)
+    if token_key is None:
+        return None
+
+    generation = _token_cache_generation
     with get_db_connection() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id, gitlab_id, username, email, name, avatar_url, token_last_used_at
-            FROM users
-            WHERE token = ?
-            """,
-            (token,),
-        )
+        cursor = conn.execute(_VALIDATE_TOKEN_SQL, (current_timestamp_ms(), token_key))
         row = cursor.fetchone()
+        conn.commit()
 
-        if not row:
-            return None
+    if not row:
+        return None
 
-        # Update last used timestamp
-        now = current_timestamp_ms()
-        conn.execute(
-            "UPDATE users SET token_last_used_at = ? WHERE token = ?",
-            (now, token),
-        )
-        conn.commit()
+    user = {
+        "user_id": row["id"],
+        "gitlab_id": row["gitlab_id"],
+        "username": row["username"],
+        "email": row["email"],
+        "name": row["name"],
+        "avatar_url": row["avatar_url"],
+    }
 
-        return {
-            "user_id": row["id"],
-            "gitlab_id": row["gitlab_id"],
-            "username": row["username"],
-            "email": row["email"],
-            "name": row["name"],
-            "avatar_url": row["avatar_url"],
-        }
+    with _token_cache_lock:
+        # A token rotated or deleted while we were reading must not be cached
+        if generation != _token_cache_generation:
+            return dict(user)
+        if token not in _token_cache and len(_token_cache) >= AUTH_TOKEN_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[token] = (time.monotonic() + AUTH_TOKEN_CACHE_TTL, user)
+
+    return dict(user)
 
 
 def rotate_user_token(user_id: int) -> str | None:
@@ -228,32 +358,26 @@ def rotate_user_token(user_id: int) -> str | None:
         New token UUID if successful, None if user not found
     """
     # Generate new token
-    new_token = str(uuid.uuid4())
+    new_token = uuid.uuid4()
     now = current_timestamp_ms()
 
     with get_db_connection() as conn:
-        # Check user exists and get old token
+        # Update in place; no matching row means the user doesn't exist
         cursor = conn.execute(
-            "SELECT id FROM users WHERE id = ?",
-            (user_id,),
-        )
-        row = cursor.fetchone()
-
-        if not row:
-            return None
-
-        # Update token
-        conn.execute(
             """
             UPDATE users
             SET token = ?, token_last_used_at = ?, updated_at = ?
             WHERE id = ?
             """,
-            (new_token, None, now, user_id),
+            (new_token.bytes, None, now, user_id),
         )
         conn.commit()
 
-        return new_token
+    if cursor.rowcount == 0:
+        return None
+
+    _invalidate_user_tokens(user_id)
+    return str(new_token)
 
 
 def list_user_tokens(user_id: int, limit: int = 10) -> list[dict[str, Any]]:
@@ -266,7 +390,7 @@ def list_user_tokens(user_id: int, limit: int = 10) -> list[dict[str, Any]]:
     Returns:
         List with single token dictionary or empty list
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(
             """
             SELECT id, token, token_last_used_at, created_at
@@ -283,7 +407,7 @@ def list_user_tokens(user_id: int, limit: int = 10) -> list[dict[str, Any]]:
         return [
             {
                 "id": row["id"],
-                "token": row["token"],
+                "token": _token_str(row["token"]),
                 "name": "API Token",
                 "last_used_at": row["token_last_used_at"],
                 "created_at": row["created_at"],
@@ -304,4 +428,5 @@ def delete_user(user_id: int) -> bool:
         cursor = conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
         conn.commit()
 
-        return cursor.rowcount > 0
+    _invalidate_user_tokens(user_id)
+    return cursor.rowcount > 0
@@ -29,6 +29,13 @@ DETAIL_URL_TEMPLATE = f"{BASE_URL}/f/info/xxfb_fg/xnzx/template/detail?xxid={{xx
 
 MIN_REQUEST_INTERVAL = 1.0 / 3.0  # 3 requests per second
 
+# Pooled HTTP session shared across scrape runs
+HTTP_POOL_CONNECTIONS = 4  # Number of hosts to keep connection pools for
+HTTP_POOL_MAXSIZE = 10  # Keep-alive connections per host
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5  # Seconds, doubled on each retry
+HTTP_RETRY_STATUSES = (500, 502, 503, 504)  # Transient upstream errors worth retrying
+
 
 # =============================================================================
 # Scheduler Settings
@@ -36,7 +43,11 @@ MIN_REQUEST_INTERVAL = 1.0 / 3.0  # 3 requests per second
 
 SCRAPE_INTERVAL = 15 * 60  # 15 minutes
 MIN_SCRAPE_INTERVAL = 10 * 60  # 10 minutes
-MAX_PAGES_PER_RUN = 4
+MAX_ITEMS_PER_RUN = 120  # Caps detail page fetches per run (first run or backlog)
+LIST_PAGE_SIZE = 100  # Large enough that one request usually covers a whole interval
+MAX_PAGES_PER_RUN = -(-MAX_ITEMS_PER_RUN // LIST_PAGE_SIZE)  # Rounded up
+PRUNE_INTERVAL = 24 * 60 * 60  # Daily
+ARTICLE_RETENTION_DAYS = int(os.getenv("ARTICLE_RETENTION_DAYS", "0"))  # 0 keeps everything
 
 
 # =============================================================================
@@ -44,6 +55,9 @@ MAX_PAGES_PER_RUN = 4
 # =============================================================================
 
 DB_PATH = Path(os.getenv("DB_PATH", "info_rss.db"))
+DB_BUSY_TIMEOUT = 5.0  # Seconds to wait for a competing writer before failing
+DB_READ_POOL_SIZE = 8  # Idle read connections kept open for request handlers
+DB_CACHED_STATEMENTS = 256  # Compiled statements kept per connection
 
 
 # =============================================================================
@@ -57,6 +71,10 @@ FEED_LANGUAGE = "zh-CN"
 MAX_RSS_ITEMS = 100
 MAX_RSS_ITEMS_LIMIT = 1000
 RSS_CACHE_MAX_AGE = 300  # 5 minutes
+RSS_SHARED_CACHE_MAX_AGE = 600  # s-maxage for proxies/CDNs on the public feed
+RSS_STALE_WHILE_REVALIDATE = 60  # Seconds
+RSS_CACHE_MAX_ENTRIES = 64  # Distinct filter combinations kept in memory
+RSS_GZIP_LEVEL = 6  # Cached feeds are compressed once per render
 
 
 # =============================================================================
@@ -68,6 +86,9 @@ API_DESCRIPTION = "RSS feed for Tsinghua University Info Portal"
 API_VERSION = "1.0.0"
 SERVER_HOST = "0.0.0.0"
 SERVER_PORT = 8000
+SERVER_LIMIT_CONCURRENCY = 256  # Reject with 503 beyond this many in-flight requests
+SERVER_TIMEOUT_KEEP_ALIVE = 30  # Seconds
+READY_CHECK_CACHE_SECONDS = 5.0  # How long a /ready database probe result is reused
 
 
 # =============================================================================
@@ -87,7 +108,14 @@ GITLAB_CLIENT_ID = os.getenv("GITLAB_CLIENT_ID", "")
 GITLAB_CLIENT_SECRET = os.getenv("GITLAB_CLIENT_SECRET", "")
 GITLAB_REDIRECT_URI = os.getenv("GITLAB_REDIRECT_URI", "http://localhost:8000/auth/callback")
 GITLAB_SCOPES = ["openid", "profile", "email"]
+GITLAB_HTTP_TIMEOUT = 10.0  # Seconds
+GITLAB_HTTP_CONNECT_TIMEOUT = 3.0  # Fail fast when GitLab is unreachable
+GITLAB_HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle GitLab connection is kept for the next login
 SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+OAUTH_STATE_TTL = 600  # Seconds a login has to complete the GitLab round trip
+OAUTH_STATE_MAX_ENTRIES = 1000  # Pending logins kept; the oldest are dropped beyond this
+AUTH_TOKEN_CACHE_TTL = 60  # Seconds a validated token is trusted without a DB lookup
+AUTH_TOKEN_CACHE_MAX_ENTRIES = 1024
 
 
 # =============================================================================
@@ -98,3 +126,4 @@ USER_RATE_LIMIT_PER_SECOND = 1
 USER_RATE_LIMIT_PER_HOUR = 10
 RATE_LIMIT_WINDOW_SECOND = 1
 RATE_LIMIT_WINDOW_HOUR = 3600
+RATE_LIMIT_CLEANUP_INTERVAL = 60 * 60  # Drop counters of idle users hourly
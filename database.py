@@ -4,13 +4,35 @@ from __future__ import annotations
 
 import hashlib
 import os
+import queue
 import sqlite3
 import stat
+import threading
+import time
 from contextlib import contextmanager
-from datetime import datetime, timezone
 from typing import Any
 
-from config import DB_PATH
+from config import DB_BUSY_TIMEOUT, DB_CACHED_STATEMENTS, DB_PATH, DB_READ_POOL_SIZE
+
+# Applied to every connection; journal_mode=WAL is persistent and set in init_db().
+# NORMAL is durable in WAL mode except for the last commits on power loss.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Idle read-only connections kept open between requests (most recently used first)
+_read_pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=DB_READ_POOL_SIZE)
+
+# Single long-lived read-write connection; SQLite allows one writer at a time anyway
+_write_conn: sqlite3.Connection | None = None
+_write_lock = threading.RLock()
+
+# In-memory copy of the last scrape time; this process is the only writer
+_last_scrape_ms: int | None = None
+_last_scrape_loaded = False
+_last_scrape_lock = threading.Lock()
 
 
 def current_timestamp_ms() -> int:
@@ -19,78 +41,220 @@ def current_timestamp_ms() -> int:
     Returns:
         Current timestamp as integer milliseconds since Unix epoch
     """
-    return int(datetime.now(timezone.utc).timestamp() * 1000)
+    return time.time_ns() // 1_000_000
 
 
 def _ensure_db_permissions() -> None:
-    """Ensure database file has restrictive permissions."""
+    """Ensure the database file and its WAL files have restrictive permissions.
+
+    The database file is created as 0600 if missing, so SQLite (which gives the
+    -wal and -shm files the database file's mode) never creates them readable by
+    others. Existing files are tightened as well; the WAL holds recent writes,
+    including user tokens and emails.
+    """
+    mode = stat.S_IRUSR | stat.S_IWUSR  # 0600, owner read/write only
     try:
-        if DB_PATH.exists():
-            # Set file permissions to 0600 (owner read/write only)
-            os.chmod(DB_PATH, stat.S_IRUSR | stat.S_IWUSR)
+        os.close(os.open(DB_PATH, os.O_CREAT | os.O_WRONLY, mode))
+        for path in (
+            DB_PATH,
+            DB_PATH.with_name(f"{DB_PATH.name}-wal"),
+            DB_PATH.with_name(f"{DB_PATH.name}-shm"),
+        ):
+            if path.exists():
+                os.chmod(path, mode)
     except OSError:
         # Silently fail on systems that don't support Unix permissions
         pass
 
 
+# Maximum length of each string field accepted by validate_article()
+_STRING_FIELD_LIMITS = (
+    ("xxid", 100),
+    ("title", 1000),
+    ("url", 2000),
+    ("department", 200),
+    ("category", 100),
+)
+_MAX_CONTENT_LENGTH = 1_000_000  # 1MB limit; HTML bodies can be very long
+
+# Fields covered by an article's digest, in hashing order
+_DIGEST_FIELDS = ("title", "content", "department", "category")
+
+# SQLite builds before 3.32 reject statements with more than 999 parameters
+_MAX_SQL_PARAMS = 999
+
+_UPSERT_ARTICLE_SQL = """
+    INSERT INTO articles (xxid, title, content, department, category, publish_time, url, digest, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(xxid) DO UPDATE SET
+        title = excluded.title,
+        content = excluded.content,
+        department = excluded.department,
+        category = excluded.category,
+        publish_time = excluded.publish_time,
+        url = excluded.url,
+        digest = excluded.digest,
+        updated_at = excluded.updated_at
+"""
+
+
+def _connect(check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a configured database connection.
+
+    Args:
+        check_same_thread: Whether sqlite3 should reject use from other threads
+
+    Returns:
+        sqlite3.Connection: Database connection
+    """
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT,
+        check_same_thread=check_same_thread,
+        cached_statements=DB_CACHED_STATEMENTS,
+    )
+    conn.row_factory = sqlite3.Row
+    try:
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
 @contextmanager
 def get_db_connection():
-    """Get a database connection with context management.
+    """Get the shared read-write connection with context management.
+
+    The connection stays open for the life of the process, so writes skip
+    reopening the file and keep a warm page and statement cache. Callers hold it
+    exclusively until the block exits.
 
     Yields:
         sqlite3.Connection: Database connection
+
+    Raises:
+        sqlite3.OperationalError: If another thread holds the connection for longer
+            than DB_BUSY_TIMEOUT
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    global _write_conn
+    if not _write_lock.acquire(timeout=DB_BUSY_TIMEOUT):
+        raise sqlite3.OperationalError("database is locked")
     try:
-        yield conn
+        if _write_conn is None:
+            _write_conn = _connect(check_same_thread=False)
+        conn = _write_conn
+        try:
+            yield conn
+        finally:
+            # Never hand an unfinished transaction to the next caller
+            if conn.in_transaction:
+                conn.rollback()
     finally:
-        conn.close()
-
+        _write_lock.release()
 
-def init_db() -> None:
-    """Initialize the database schema."""
-    with get_db_connection() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                xxid TEXT UNIQUE NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT,
-                department TEXT,
-                category TEXT,
-                publish_time INTEGER NOT NULL,
-                url TEXT NOT NULL,
-                digest TEXT NOT NULL,
-                created_at INTEGER NOT NULL,
-                updated_at INTEGER NOT NULL
-            )
-        """)
 
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS scrape_metadata (
-                key TEXT PRIMARY KEY,
-                value INTEGER NOT NULL
-            )
-        """)
+@contextmanager
+def get_read_connection():
+    """Borrow a pooled connection for read-only queries.
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_publish_time ON articles(publish_time DESC)
-        """)
+    With WAL enabled, readers don't block each other or the writer, so the
+    request handlers share a small pool instead of reconnecting every call.
+    Pooled connections also keep their compiled statements, so repeated point
+    lookups skip SQL parsing and planning.
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_xxid ON articles(xxid)
-        """)
+    Yields:
+        sqlite3.Connection: Connection that rejects writes (query_only)
+    """
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(check_same_thread=False)
+        conn.execute("PRAGMA query_only=ON")
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_digest ON articles(digest)
-        """)
+    try:
+        yield conn
+    finally:
+        # End any implicit read transaction so the next borrower sees fresh data
+        conn.rollback()
+        try:
+            _read_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def close_db_connections() -> None:
+    """Close the shared write connection and all pooled read connections."""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is not None:
+            _write_conn.close()
+            _write_conn = None
+
+    while True:
+        try:
+            _read_pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+# Applied as one script in a single transaction
+_SCHEMA = """
+    BEGIN;
+
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        xxid TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT,
+        department TEXT,
+        category TEXT,
+        publish_time INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS scrape_metadata (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_publish_time ON articles(publish_time DESC);
+
+    -- xxid is already indexed by its UNIQUE constraint and nothing looks up
+    -- articles by digest; drop these from older databases to save index writes
+    DROP INDEX IF EXISTS idx_xxid;
+    DROP INDEX IF EXISTS idx_digest;
+
+    -- Serves category-filtered feeds: equality on category, already in feed order
+    CREATE INDEX IF NOT EXISTS idx_category_publish_time
+    ON articles(category, publish_time DESC);
+
+    COMMIT;
+"""
 
-        conn.commit()
 
-    # Ensure restrictive permissions on database file
+def init_db() -> None:
+    """Initialize the database schema."""
+    # Before the first connection, so no database file is ever created readable by
+    # others; writes don't change the mode bits, so once at startup is enough
     _ensure_db_permissions()
 
+    with get_db_connection() as conn:
+        # WAL lets /rss readers proceed while the scraper writes (persists in the file)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        conn.executescript(_SCHEMA)
+
+    # Prime the in-memory copy so neither requests nor the scheduler read it from disk
+    global _last_scrape_ms, _last_scrape_loaded
+    with _last_scrape_lock:
+        _last_scrape_ms = get_last_scrape_time()
+        _last_scrape_loaded = True
+
 
 def compute_digest(article: dict[str, Any]) -> str:
     """Compute a digest hash for an article.
@@ -101,9 +265,15 @@ def compute_digest(article: dict[str, Any]) -> str:
     Returns:
         SHA256 hex digest of the article content
     """
-    # Create a string with all relevant fields for deduplication
-    content_str = f"{article.get('title', '')}|{article.get('content', '')}|{article.get('department', '')}|{article.get('category', '')}"
-    return hashlib.sha256(content_str.encode("utf-8")).hexdigest()
+    # Hash the fields one by one rather than joining them first, so a large
+    # content body isn't copied into an intermediate string; the bytes hashed
+    # are the same "title|content|department|category" as before
+    digest = hashlib.sha256()
+    for i, field in enumerate(_DIGEST_FIELDS):
+        if i:
+            digest.update(b"|")
+        digest.update(str(article.get(field, "")).encode("utf-8"))
+    return digest.hexdigest()
 
 
 def validate_article(article: dict[str, Any]) -> None:
@@ -115,20 +285,13 @@ def validate_article(article: dict[str, Any]) -> None:
     Raises:
         ValueError: If article data is invalid
     """
-    # Validate required string fields and their lengths
-    string_fields = {
-        "xxid": 100,
-        "title": 1000,
-        "url": 2000,
-        "department": 200,
-        "category": 100,
-    }
-
-    for field, max_length in string_fields.items():
-        if field in article and article[field] is not None:
-            if not isinstance(article[field], str):
+    # Validate string fields and their lengths
+    for field, max_length in _STRING_FIELD_LIMITS:
+        value = article.get(field)
+        if value is not None:
+            if not isinstance(value, str):
                 raise ValueError(f"{field} must be string")
-            if len(article[field]) > max_length:
+            if len(value) > max_length:
                 raise ValueError(f"{field} exceeds maximum length of {max_length}")
 
     # Validate publish_time is a valid timestamp
@@ -136,18 +299,22 @@ def validate_article(article: dict[str, Any]) -> None:
         raise ValueError("publish_time must be integer")
 
     # Validate content length (can be very long for HTML)
-    if "content" in article and article["content"] is not None:
-        if not isinstance(article["content"], str):
+    content = article.get("content")
+    if content is not None:
+        if not isinstance(content, str):
             raise ValueError("content must be string")
-        if len(article["content"]) > 1_000_000:  # 1MB limit
+        if len(content) > _MAX_CONTENT_LENGTH:
             raise ValueError("content exceeds maximum length of 1MB")
 
 
-def upsert_article(article: dict[str, Any]) -> int:
-    """Insert or update an article.
+def upsert_articles(articles: list[dict[str, Any]]) -> list[int]:
+    """Insert or update a batch of articles in a single transaction.
+
+    Existing digests are fetched with one query and unchanged articles are skipped,
+    so only new or modified rows are written.
 
     Args:
-        article: Article dictionary with keys:
+        articles: Article dictionaries with keys:
             - xxid: Article ID
             - title: Article title
             - content: Article content (HTML)
@@ -157,58 +324,84 @@ def upsert_article(article: dict[str, Any]) -> int:
             - url: Article URL
 
     Returns:
-        True if the article was newly inserted, False if updated or skipped
+        State per article in input order: 0 new, 1 updated, 2 skipped
+
+    Raises:
+        ValueError: If any article is invalid (nothing is written in that case)
     """
-    # Validate article data before insertion
-    validate_article(article)
+    if not articles:
+        return []
+
+    # Validate all articles before touching the database
+    for article in articles:
+        validate_article(article)
 
-    digest = compute_digest(article)
     now = current_timestamp_ms()
+    states: list[int] = []
+    rows: list[tuple[Any, ...]] = []
+
+    with get_db_connection() as conn, conn:
+        # Take the write lock before reading digests so the comparison and the
+        # writes see the same data, and the transaction can't fail to upgrade later
+        conn.execute("BEGIN IMMEDIATE")
+
+        # Chunked to stay under SQLite's bound-parameter limit on older builds
+        xxids = list({article["xxid"] for article in articles})
+        existing: dict[str, str] = {}
+        for start in range(0, len(xxids), _MAX_SQL_PARAMS):
+            chunk = xxids[start : start + _MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT xxid, digest FROM articles WHERE xxid IN ({placeholders})", chunk
+            )
+            existing.update((row["xxid"], row["digest"]) for row in cursor)
+
+        for article in articles:
+            digest = compute_digest(article)
+            existing_digest = existing.get(article["xxid"])
+
+            # If article exists and digest is the same, skip update
+            if existing_digest == digest:
+                states.append(2)  # Skipped
+                continue
+
+            states.append(0 if existing_digest is None else 1)  # 0: New, 1: Updated
+            existing[article["xxid"]] = digest
+            rows.append(
+                (
+                    article["xxid"],
+                    article["title"],
+                    article["content"],
+                    article["department"],
+                    article["category"],
+                    article["publish_time"],
+                    article["url"],
+                    digest,
+                    now,
+                    now,
+                )
+            )
 
-    with get_db_connection() as conn:
-        # Check if article exists with same digest
-        cursor = conn.execute("SELECT digest FROM articles WHERE xxid = ?", (article["xxid"],))
-        existing = cursor.fetchone()
+        if rows:
+            conn.executemany(_UPSERT_ARTICLE_SQL, rows)
 
-        # If article exists and digest is the same, skip update
-        if existing and existing["digest"] == digest:
-            return 2  # Skipped
+    return states
 
-        # Insert or update article
-        cursor = conn.execute(
-            """
-            INSERT INTO articles (xxid, title, content, department, category, publish_time, url, digest, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(xxid) DO UPDATE SET
-                title = excluded.title,
-                content = excluded.content,
-                department = excluded.department,
-                category = excluded.category,
-                publish_time = excluded.publish_time,
-                url = excluded.url,
-                digest = excluded.digest,
-                updated_at = excluded.updated_at
-            """,
-            (
-                article["xxid"],
-                article["title"],
-                article["content"],
-                article["department"],
-                article["category"],
-                article["publish_time"],
-                article["url"],
-                digest,
-                now,
-                now,
-            ),
-        )
-        conn.commit()
 
-    # Ensure permissions remain restrictive after database modifications
-    _ensure_db_permissions()
+def delete_articles_before(timestamp_ms: int) -> int:
+    """Delete articles published before a given timestamp.
+
+    Args:
+        timestamp_ms: Cutoff timestamp in milliseconds
+
+    Returns:
+        Number of deleted articles
+    """
+    with get_db_connection() as conn:
+        cursor = conn.execute("DELETE FROM articles WHERE publish_time < ?", (timestamp_ms,))
+        conn.commit()
 
-    # Return True only if it was a new insert
-    return 0 if existing is None else 1  # 0: New, 1: Updated
+    return cursor.rowcount
 
 
 def get_recent_articles(limit: int = 100) -> list[dict[str, Any]]:
@@ -220,7 +413,7 @@ def get_recent_articles(limit: int = 100) -> list[dict[str, Any]]:
     Returns:
         List of article dictionaries
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(
             """
             SELECT xxid, title, content, department, category, publish_time, url, created_at, updated_at
@@ -244,7 +437,7 @@ def get_articles_since(timestamp_ms: int) -> list[dict[str, Any]]:
     Returns:
         List of article dictionaries
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(
             """
             SELECT xxid, title, content, department, category, publish_time, url, created_at, updated_at
@@ -268,7 +461,7 @@ def article_exists(xxid: str) -> bool:
     Returns:
         True if article exists, False otherwise
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(
             "SELECT 1 FROM articles WHERE xxid = ? LIMIT 1",
             (xxid,),
@@ -276,18 +469,48 @@ def article_exists(xxid: str) -> bool:
         return cursor.fetchone() is not None
 
 
+def get_max_publish_time() -> int | None:
+    """Get the publish time of the newest stored article.
+
+    Returns:
+        Newest publish timestamp in milliseconds, or None if no articles are stored
+    """
+    with get_read_connection() as conn:
+        cursor = conn.execute("SELECT MAX(publish_time) AS max_time FROM articles")
+        row = cursor.fetchone()
+        return row["max_time"] if row else None
+
+
 def get_last_scrape_time() -> int | None:
     """Get the last scrape timestamp in milliseconds.
 
     Returns:
         Last scrape timestamp in milliseconds, or None if never scraped
     """
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute("SELECT value FROM scrape_metadata WHERE key = 'last_scrape_time'")
         row = cursor.fetchone()
         return row["value"] if row else None
 
 
+def get_cached_last_scrape_time() -> int | None:
+    """Get the last scrape timestamp without a database round trip.
+
+    The value is loaded by init_db() (or on first use) and kept current by
+    set_last_scrape_time().
+
+    Returns:
+        Last scrape timestamp in milliseconds, or None if never scraped
+    """
+    global _last_scrape_ms, _last_scrape_loaded
+    if not _last_scrape_loaded:
+        with _last_scrape_lock:
+            if not _last_scrape_loaded:
+                _last_scrape_ms = get_last_scrape_time()
+                _last_scrape_loaded = True
+    return _last_scrape_ms
+
+
 def set_last_scrape_time(timestamp_ms: int) -> None:
     """Set the last scrape timestamp.
 
@@ -303,3 +526,8 @@ def set_last_scrape_time(timestamp_ms: int) -> None:
             (timestamp_ms,),
         )
         conn.commit()
+
+    global _last_scrape_ms, _last_scrape_loaded
+    with _last_scrape_lock:
+        _last_scrape_ms = timestamp_ms
+        _last_scrape_loaded = True
@@ -50,7 +50,7 @@ def get_parser(url: str, html: str) -> BaseParser:
     # Try specific parsers first
     for parser_class in PARSERS:
         if parser_class.can_parse(url, html):
-            logger.debug(f"Using {parser_class.__name__} for {url}")
+            logger.debug("Using %s for %s", parser_class.__name__, url)
             return parser_class()
 
     # Fallback to catch-all parser
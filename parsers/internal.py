@@ -131,7 +131,7 @@ class InternalParser(BaseParser):
                 if "fbsj" in xx_dto:
                     result["publish_time"] = xx_dto["fbsj"]
 
-                logger.debug(f"Successfully parsed {url} via API")
+                logger.debug("Successfully parsed %s via API", url)
                 return result
             else:
                 logger.warning(f"API returned unexpected result for {url}: {data.get('result')}")
@@ -157,7 +157,7 @@ class KybgParser(BaseParser):
                     decoded = response.content.decode(encoding)
                     # Quick check: see if we have reasonable Chinese content
                     if "科研" in decoded or "清华大学" in decoded or "td1" in decoded:
-                        logger.debug(f"Successfully decoded kybg page with {encoding}")
+                        logger.debug("Successfully decoded kybg page with %s", encoding)
                         return decoded
                 except UnicodeDecodeError:
                     continue
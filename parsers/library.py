@@ -77,7 +77,7 @@ class LibraryParser(BaseParser):
         # Department is always "图书馆" (Library) for these pages
         result["department"] = "图书馆"
 
-        logger.debug(f"Successfully parsed library page {url}")
+        logger.debug("Successfully parsed library page %s", url)
         return result
 
     def _fetch_with_correct_encoding(self, url: str, session: Any = None) -> str | None:
@@ -115,7 +115,7 @@ class LibraryParser(BaseParser):
                     decoded = response.content.decode(encoding)
                     # Quick check: see if we have reasonable Chinese content
                     if "图书馆" in decoded or "v_news_content" in decoded:
-                        logger.debug(f"Successfully decoded library page with {encoding}")
+                        logger.debug("Successfully decoded library page with %s", encoding)
                         return decoded
                 except UnicodeDecodeError:
                     continue
@@ -1,37 +1,115 @@
-"""In-memory rate limiting for RSS feed endpoint."""
+"""In-memory rate limiting for RSS feed endpoint.
+
+Counters are keyed by user ID and live in process memory, so they are only
+accurate while the server runs a single worker (see ``app.py``).
+"""
 
 from __future__ import annotations
 
+import math
 import time
 from collections import defaultdict
 
-# In-memory rate limit tracking: user_id -> [(window_start, count)]
-_rate_limit_store: dict[int, dict[str, tuple[float, int]]] = defaultdict(
-    lambda: {"second": (0.0, 0), "hour": (0.0, 0)}
-)
+# In-memory rate limit tracking:
+# user_id -> {window_seconds: (window_start, previous_count, current_count)}
+_rate_limit_store: dict[int, dict[int, tuple[float, int, int]]] = defaultdict(dict)
+
+
+def _retry_after(
+    now: float,
+    window_seconds: int,
+    max_requests: int,
+    window_start: float,
+    previous: int,
+    current: int,
+) -> int:
+    """Compute how long until a window's estimate drops below its limit again.
+
+    Args:
+        now: Current time in seconds
+        window_seconds: Window length in seconds
+        max_requests: Maximum requests allowed in the window
+        window_start: Start of the current fixed window
+        previous: Request count of the previous fixed window
+        current: Request count of the current fixed window
+
+    Returns:
+        Whole seconds to wait, at least 1
+    """
+    if current < max_requests:
+        # The previous window's share decays within the current window
+        ready_at = window_start + window_seconds * (1 - (max_requests - current) / previous)
+    else:
+        # The current count itself has to decay in the next window
+        ready_at = window_start + window_seconds * (2 - max_requests / current)
+    return max(math.ceil(ready_at - now), 1)
+
 
+def check_rate_limits(user_id: int, windows: list[tuple[int, int]]) -> list[tuple[bool, int, int]]:
+    """Check several rate limit windows for a user in one pass (in-memory).
 
-def check_rate_limit(user_id: int, window_seconds: int, max_requests: int) -> tuple[bool, int]:
-    """Check if user is within rate limit (in-memory).
+    Each window is a sliding-window counter: the previous fixed window's count is
+    weighted by how much of it still overlaps the last ``window_seconds``, so a
+    burst straddling a window boundary can't reach twice the limit. A request is
+    admitted while the estimate is below the limit, so a client polling at exactly
+    the advertised rate is never rejected. It is only counted if every window
+    allows it, so a request rejected by one window doesn't use up the others.
 
     Args:
         user_id: User database ID
-        window_seconds: Time window in seconds (1 or 3600)
-        max_requests: Maximum requests allowed in window
+        windows: List of (window_seconds, max_requests) pairs
 
     Returns:
-        Tuple of (allowed, remaining_requests)
+        List of (allowed, remaining_requests, retry_after_seconds) tuples, one per
+        window; retry_after_seconds is 0 for windows that allow the request
     """
     now = time.time()
-    key = "second" if window_seconds == 1 else "hour"
-    window_start, count = _rate_limit_store[user_id][key]
+    counters = _rate_limit_store[user_id]
 
-    if now - window_start >= window_seconds:
-        _rate_limit_store[user_id][key] = (now, 1)
-        return True, max_requests - 1
+    states = []
+    for window_seconds, max_requests in windows:
+        aligned_start = now - (now % window_seconds)
+        window_start, previous, current = counters.get(window_seconds, (aligned_start, 0, 0))
+        if window_start != aligned_start:
+            # Roll over; the old count only carries over if its window was the last one
+            previous = current if aligned_start - window_start == window_seconds else 0
+            current = 0
+            window_start = aligned_start
 
-    if count >= max_requests:
-        return False, 0
+        overlap = 1 - (now - window_start) / window_seconds
+        estimated = current + previous * overlap
+        states.append((window_seconds, max_requests, window_start, previous, current, estimated))
 
-    _rate_limit_store[user_id][key] = (window_start, count + 1)
-    return True, max_requests - count - 1
+    if not all(estimated < limit for _, limit, *_, estimated in states):
+        return [
+            (True, max(math.ceil(limit - estimated), 0), 0)
+            if estimated < limit
+            else (False, 0, _retry_after(now, window, limit, start, previous, current))
+            for window, limit, start, previous, current, estimated in states
+        ]
+
+    results = []
+    for window_seconds, max_requests, window_start, previous, current, estimated in states:
+        counters[window_seconds] = (window_start, previous, current + 1)
+        results.append((True, max(math.ceil(max_requests - estimated - 1), 0), 0))
+    return results
+
+
+def cleanup_rate_limit_store() -> int:
+    """Drop counters of users whose windows have all gone idle.
+
+    A window that started two lengths ago no longer affects the sliding estimate,
+    so forgetting it is equivalent to keeping it.
+
+    Returns:
+        Number of users removed
+    """
+    now = time.time()
+    idle = [
+        user_id
+        for user_id, counters in _rate_limit_store.items()
+        if all(now - start >= 2 * window for window, (start, _, _) in counters.items())
+    ]
+    for user_id in idle:
+        del _rate_limit_store[user_id]
+    return len(idle)
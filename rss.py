@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import functools
+import gzip
+import hashlib
+import io
 import logging
 import re
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Any
 
@@ -15,11 +21,42 @@ from config import (
     FEED_LINK,
     FEED_TITLE,
     MAX_RSS_ITEMS_LIMIT,
+    RSS_CACHE_MAX_AGE,
+    RSS_CACHE_MAX_ENTRIES,
+    RSS_GZIP_LEVEL,
+    SCRAPE_INTERVAL,
 )
-from database import get_db_connection
+from database import current_timestamp_ms, get_read_connection
 
 logger = logging.getLogger(__name__)
 
+RssCacheKey = tuple[int, frozenset[str], frozenset[str]]
+
+# Allow common Chinese characters, letters, numbers, punctuation
+_CATEGORY_PATTERN = re.compile(r"^[\w\s\u4e00-\u9fff\-_.（）()]+$")
+
+_STYLE_TAG_PATTERN = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_STYLE_ATTR_PATTERN = re.compile(r'\s+style\s*=\s*["\'][^"\']*["\']', re.IGNORECASE)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_INTER_TAG_WHITESPACE_PATTERN = re.compile(r">\s+<")
+
+# Rendered feeds as (xml, gzip-compressed xml)
+RenderedFeed = tuple[bytes, bytes]
+
+# (limit, categories_in, categories_not_in) -> (expires_at, rendered feed)
+_rss_cache: dict[RssCacheKey, tuple[float, RenderedFeed]] = {}
+# Bumped on every refresh so renders started before a scrape are not stored
+_rss_cache_generation = 0
+# Data version (ms) the cached feeds were rendered at; feeds rendered after a
+# restart may reflect changes an earlier process never published, so start fresh
+_feed_version_ms = current_timestamp_ms()
+# Scrapes and prunes refresh from different threads; one at a time keeps the
+# version moving forward together with the data it was rendered from
+_rss_refresh_lock = threading.Lock()
+# Guards swapping in a refreshed cache against storing a render made on a miss;
+# held only around those updates, never while rendering
+_rss_cache_lock = threading.Lock()
+
 
 def validate_category_input(categories: list[str] | None) -> list[str]:
     """Validate and sanitize category input parameters.
@@ -55,9 +92,9 @@ def validate_category_input(categories: list[str] | None) -> list[str]:
         if len(category) > 100:
             raise ValueError("Category too long (maximum: 100 characters)")
 
-        # Validate character set (allow common Chinese characters, letters, numbers, punctuation)
+        # Validate character set
         # This prevents injection attempts while allowing legitimate content
-        if not re.match(r"^[\w\s\u4e00-\u9fff\-_.（）()]+$", category):
+        if not _CATEGORY_PATTERN.match(category):
             raise ValueError(f"Category contains invalid characters: {category}")
 
         validated.append(category)
@@ -65,6 +102,22 @@ def validate_category_input(categories: list[str] | None) -> list[str]:
     return validated
 
 
+@functools.lru_cache(maxsize=256)
+def _validate_category_tuple(categories: tuple[str, ...]) -> frozenset[str]:
+    """Validate categories, memoized by input (readers poll with constant filters).
+
+    Args:
+        categories: Category strings as received in the query
+
+    Returns:
+        Set of sanitized category strings
+
+    Raises:
+        ValueError: If categories contain invalid data
+    """
+    return frozenset(validate_category_input(list(categories)))
+
+
 def strip_styles_from_html(html: str) -> str:
     """Remove style attributes and style tags from HTML.
 
@@ -75,27 +128,27 @@ def strip_styles_from_html(html: str) -> str:
         HTML string with styles removed
     """
     # Remove style tags
-    html = re.sub(r"<style[^>]*>.*?</style>", "", html, flags=re.DOTALL | re.IGNORECASE)
+    html = _STYLE_TAG_PATTERN.sub("", html)
 
     # Remove style attributes from any tag
-    html = re.sub(r'\s+style\s*=\s*["\'][^"\']*["\']', "", html, flags=re.IGNORECASE)
+    html = _STYLE_ATTR_PATTERN.sub("", html)
 
     # Remove class attributes (optional - remove if you want to keep classes)
     # html = re.sub(r'\s+class\s*=\s*["\'][^"\']*["\']', '', html, flags=re.IGNORECASE)
 
     # Clean up extra whitespace
-    html = re.sub(r"\s+", " ", html)
-    html = re.sub(r">\s+<", "><", html)
+    html = _WHITESPACE_PATTERN.sub(" ", html)
+    html = _INTER_TAG_WHITESPACE_PATTERN.sub("><", html)
 
     return html.strip()
 
 
-def generate_rss(
+def _build_feed(
     limit: int = 100,
     categories_in: list[str] | None = None,
     categories_not_in: list[str] | None = None,
-) -> str:
-    """Generate RSS feed from database articles.
+) -> feedgenerator.Rss201rev2Feed:
+    """Build an RSS feed object from database articles.
 
     Args:
         limit: Maximum number of articles to include (must be positive, max 1000)
@@ -103,7 +156,7 @@ def generate_rss(
         categories_not_in: List of categories to filter out (exclude these categories)
 
     Returns:
-        RSS feed as XML string
+        Feed object ready to be serialized
     """
     # Validate limit parameter
     if not isinstance(limit, int) or limit < 1:
@@ -119,6 +172,8 @@ def generate_rss(
         link=FEED_LINK,
         description=FEED_DESCRIPTION,
         language=FEED_LANGUAGE,
+        # Minutes readers may cache the feed; nothing changes between scrapes
+        ttl=SCRAPE_INTERVAL // 60,
     )
 
     # Build query with filters
@@ -142,39 +197,205 @@ def generate_rss(
     query += " ORDER BY publish_time DESC LIMIT ?"
     params.append(limit)
 
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.execute(query, params)
         articles = cursor.fetchall()
 
+    # sqlite3.Row supports lookup by column name; no need to copy each into a dict
     for article in articles:
-        article_dict = dict(article)
         publish_time = datetime.fromtimestamp(
-            article_dict["publish_time"] / 1000,
+            article["publish_time"] / 1000,
             tz=timezone.utc,
         )
 
         # Build description with metadata
         description_parts = []
-        if article_dict.get("department"):
-            description_parts.append(
-                f"<p><strong>发布单位:</strong> {article_dict['department']}</p>"
-            )
-        if article_dict.get("category"):
-            description_parts.append(f"<p><strong>分类:</strong> {article_dict['category']}</p>")
+        if article["department"]:
+            description_parts.append(f"<p><strong>发布单位:</strong> {article['department']}</p>")
+        if article["category"]:
+            description_parts.append(f"<p><strong>分类:</strong> {article['category']}</p>")
 
         # Add content if available, with styles removed
-        if article_dict.get("content"):
-            clean_content = strip_styles_from_html(article_dict["content"])
+        if article["content"]:
+            clean_content = strip_styles_from_html(article["content"])
             description_parts.append(clean_content)
 
-        description = "".join(description_parts) if description_parts else article_dict["title"]
+        description = "".join(description_parts) if description_parts else article["title"]
 
         feed.add_item(
-            title=article_dict["title"],
-            link=article_dict["url"],
+            title=article["title"],
+            link=article["url"],
             description=description,
             pubdate=publish_time,
-            unique_id=article_dict["xxid"],
+            unique_id=article["xxid"],
         )
 
-    return feed.writeString("utf-8")
+    return feed
+
+
+def generate_rss_bytes(
+    limit: int = 100,
+    categories_in: list[str] | None = None,
+    categories_not_in: list[str] | None = None,
+) -> bytes:
+    """Generate RSS feed from database articles as UTF-8 bytes.
+
+    The feed's XML writer streams encoded output straight into a byte buffer,
+    avoiding an intermediate str and a second encoding pass.
+
+    Args:
+        limit: Maximum number of articles to include (must be positive, max 1000)
+        categories_in: List of categories to filter in (only these categories)
+        categories_not_in: List of categories to filter out (exclude these categories)
+
+    Returns:
+        RSS feed as UTF-8 encoded XML
+    """
+    buffer = io.BytesIO()
+    _build_feed(limit, categories_in, categories_not_in).write(buffer, "utf-8")
+    return buffer.getvalue()
+
+
+def make_feed_key(
+    limit: int = 100,
+    categories_in: list[str] | None = None,
+    categories_not_in: list[str] | None = None,
+) -> RssCacheKey:
+    """Validate feed query parameters and normalize them into a cache key.
+
+    Args:
+        limit: Maximum number of articles to include
+        categories_in: List of categories to filter in (only these categories)
+        categories_not_in: List of categories to filter out (exclude these categories)
+
+    Returns:
+        Normalized (limit, categories_in, categories_not_in) tuple
+
+    Raises:
+        ValueError: If categories contain invalid data
+    """
+    return (
+        limit,
+        _validate_category_tuple(tuple(categories_in or ())),
+        _validate_category_tuple(tuple(categories_not_in or ())),
+    )
+
+
+def feed_etag(key: RssCacheKey, version_ms: int) -> str:
+    """Build a weak ETag for a feed without rendering it.
+
+    Feeds only change when a scrape updates the database, so the data version plus
+    the normalized filters identify the feed content.
+
+    Args:
+        key: Normalized (limit, categories_in, categories_not_in) tuple
+        version_ms: Timestamp of the last database update in milliseconds
+
+    Returns:
+        Quoted weak ETag
+    """
+    limit, categories_in, categories_not_in = key
+    filters = f"{limit}|{sorted(categories_in)}|{sorted(categories_not_in)}"
+    filter_hash = hashlib.blake2b(filters.encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{version_ms}-{filter_hash}"'
+
+
+def _render_rss(key: RssCacheKey) -> RenderedFeed:
+    """Render and compress the feed for a cache key.
+
+    Args:
+        key: Normalized (limit, categories_in, categories_not_in) tuple
+
+    Returns:
+        Tuple of (UTF-8 encoded RSS XML, gzip-compressed XML)
+    """
+    limit, categories_in, categories_not_in = key
+    rss_xml = generate_rss_bytes(
+        limit=limit,
+        categories_in=sorted(categories_in),
+        categories_not_in=sorted(categories_not_in),
+    )
+    return rss_xml, gzip.compress(rss_xml, compresslevel=RSS_GZIP_LEVEL, mtime=0)
+
+
+def feed_version() -> int:
+    """Get the data version of the feeds currently served.
+
+    Returns:
+        Version timestamp in milliseconds, for ETag and Last-Modified
+    """
+    return _feed_version_ms
+
+
+def refresh_rss_cache(limit: int = 100) -> None:
+    """Re-render cached feeds after the database has been updated.
+
+    The unfiltered feed and every filter combination still live in the cache are
+    rendered up front and swapped in with a single assignment, so requests keep
+    hitting the cache across scrapes. Expired entries belong to filters nobody
+    requested recently and are dropped rather than re-rendered. The feed version
+    becomes the time rendering started and is published only after the swap, so a
+    validator never points at a feed rendered before the update.
+
+    Args:
+        limit: Item limit of the unfiltered feed to pre-render
+    """
+    global _rss_cache, _rss_cache_generation, _feed_version_ms
+    with _rss_refresh_lock:
+        version_ms = current_timestamp_ms()
+        now = time.monotonic()
+        with _rss_cache_lock:
+            keys: set[RssCacheKey] = {(limit, frozenset(), frozenset())}
+            keys.update(key for key, (expires_at, _) in _rss_cache.items() if expires_at > now)
+
+        expires_at = time.monotonic() + RSS_CACHE_MAX_AGE
+        fresh = {key: (expires_at, _render_rss(key)) for key in keys}
+
+        with _rss_cache_lock:
+            _rss_cache = fresh
+            _rss_cache_generation += 1
+            _feed_version_ms = version_ms
+    logger.info("Pre-rendered %d RSS feed variants", len(fresh))
+
+
+def peek_cached_rss(key: RssCacheKey) -> RenderedFeed | None:
+    """Get an RSS feed from the in-memory cache without rendering it.
+
+    Args:
+        key: Normalized feed key from make_feed_key()
+
+    Returns:
+        Tuple of (UTF-8 encoded RSS XML, gzip-compressed XML), or None on a miss
+    """
+    cached = _rss_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def get_cached_rss(key: RssCacheKey) -> RenderedFeed:
+    """Get an RSS feed from the in-memory cache, generating it on a miss.
+
+    Args:
+        key: Normalized feed key from make_feed_key()
+
+    Returns:
+        Tuple of (UTF-8 encoded RSS XML, gzip-compressed XML)
+    """
+    cached = peek_cached_rss(key)
+    if cached is not None:
+        return cached
+
+    generation = _rss_cache_generation
+    rendered = _render_rss(key)
+
+    # Only store if no scrape refreshed the cache while we were rendering; checked
+    # under the lock so a refresh can't swap the cache between check and store
+    with _rss_cache_lock:
+        if generation == _rss_cache_generation:
+            if key not in _rss_cache and len(_rss_cache) >= RSS_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry (dicts preserve insertion order)
+                _rss_cache.pop(next(iter(_rss_cache)), None)
+            _rss_cache[key] = (time.monotonic() + RSS_CACHE_MAX_AGE, rendered)
+
+    return rendered
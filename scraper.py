@@ -3,19 +3,29 @@
 
 from __future__ import annotations
 
+import hashlib
 import html
+import json
 import logging
 import re
+import threading
 import time
 from datetime import datetime, timezone
 from enum import IntEnum
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import (
     BASE_URL,
     DETAIL_URL_TEMPLATE,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_BACKOFF,
+    HTTP_RETRY_STATUSES,
     LIST_API,
     LIST_URL,
     MIN_REQUEST_INTERVAL,
@@ -42,11 +52,22 @@ class InfoTsinghuaScraper:
     DETAIL_URL_TEMPLATE = DETAIL_URL_TEMPLATE
     MIN_REQUEST_INTERVAL = MIN_REQUEST_INTERVAL
 
+    # HTTP session shared by all scraper instances so keep-alive connections
+    # (and their TLS handshakes) survive across scrape runs
+    _shared_session: requests.Session | None = None
+
     def __init__(self) -> None:
         """Initialize the scraper."""
         self._session: requests.Session | None = None
         self._csrf_token: str = ""
         self._last_request_time: float = 0.0
+        self._rate_limit_lock = threading.Lock()
+        # Body digest of the last processed response per (lmid, page, page_size)
+        self._list_digests: dict[tuple[str, int, int], bytes] = {}
+        # Digests of responses fetched since, kept until mark_lists_processed()
+        self._pending_list_digests: dict[tuple[str, int, int], bytes] = {}
+        # Detail pages that could not be fetched (articles stored without content)
+        self.failed_details = 0
 
     def __enter__(self) -> InfoTsinghuaScraper:
         """Enter context manager."""
@@ -54,30 +75,64 @@ class InfoTsinghuaScraper:
         return self
 
     def __exit__(self, *args: Any) -> None:
-        """Exit context manager."""
-        if self._session:
-            self._session.close()
+        """Exit context manager (the shared session stays open for reuse)."""
+
+    def close(self) -> None:
+        """Close the shared HTTP session and its pooled connections."""
+        if InfoTsinghuaScraper._shared_session is not None:
+            InfoTsinghuaScraper._shared_session.close()
+            InfoTsinghuaScraper._shared_session = None
+        self._session = None
+
+    @classmethod
+    def _get_shared_session(cls) -> requests.Session:
+        """Get the shared HTTP session, creating it on first use.
+
+        Returns:
+            Session with a pooled, retrying HTTP adapter mounted
+        """
+        if cls._shared_session is None:
+            session = requests.Session()
+
+            # Set user agent
+            session.headers.update({"User-Agent": USER_AGENT})
+
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                # The list API is a read-only POST, so it is safe to retry as well
+                max_retries=Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_RETRY_BACKOFF,
+                    status_forcelist=HTTP_RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            cls._shared_session = session
+
+        return cls._shared_session
 
     def _rate_limit(self) -> None:
-        """Apply rate limiting by sleeping if necessary."""
-        now = time.time()
-        time_since_last_request = now - self._last_request_time
+        """Apply rate limiting by sleeping if necessary (safe to call from several threads)."""
+        with self._rate_limit_lock:
+            now = time.time()
+            time_since_last_request = now - self._last_request_time
 
-        if time_since_last_request < self.MIN_REQUEST_INTERVAL:
-            sleep_time = self.MIN_REQUEST_INTERVAL - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
-            time.sleep(sleep_time)
+            if time_since_last_request < self.MIN_REQUEST_INTERVAL:
+                sleep_time = self.MIN_REQUEST_INTERVAL - time_since_last_request
+                logger.debug("Rate limiting: sleeping for %.2fs", sleep_time)
+                time.sleep(sleep_time)
 
-        self._last_request_time = time.time()
+            self._last_request_time = time.time()
 
     def _init_session(self) -> None:
         """Initialize session by visiting the page to get cookies and CSRF token."""
         logger.info("Initializing session...")
 
-        self._session = requests.Session()
-
-        # Set user agent
-        self._session.headers.update({"User-Agent": USER_AGENT})
+        self._session = self._get_shared_session()
 
         # Visit the list page to get cookies and CSRF token
         response = self._session.get(self.LIST_URL)
@@ -104,21 +159,16 @@ class InfoTsinghuaScraper:
 
         logger.info(f"Got {len(self._session.cookies)} cookies and CSRF token")
 
-    def fetch_list(
-        self,
-        lmid: str = "all",
-        page: int = 1,
-        page_size: int = 30,
-    ) -> list[dict[str, Any]]:
-        """Fetch the list of information items.
+    def _post_list(self, lmid: str, page: int, page_size: int) -> requests.Response:
+        """Request one page of the list API.
 
         Args:
-            lmid: Column ID (default "all" for all columns)
+            lmid: Column ID
             page: Page number (1-indexed)
-            page_size: Number of items per page (default 30)
+            page_size: Number of items per page
 
         Returns:
-            List of information items.
+            Successful HTTP response
         """
         if not self._session or not self._csrf_token:
             raise RuntimeError("Scraper must be used as context manager")
@@ -141,13 +191,87 @@ class InfoTsinghuaScraper:
         self._rate_limit()
         response = self._session.post(self.LIST_API, params=params, headers=headers)
         response.raise_for_status()
-        data = response.json()
+        return response
+
+    @staticmethod
+    def _parse_list(response: requests.Response) -> list[dict[str, Any]]:
+        """Extract the items from a list API response.
+
+        Args:
+            response: Response from _post_list()
+
+        Returns:
+            List of information items.
+
+        Raises:
+            RuntimeError: If the API reports an error
+        """
+        # Parse the raw bytes directly rather than decoding to text first
+        data = json.loads(response.content)
 
         if data.get("result") != "success":
             raise RuntimeError(f"API error: {data.get('msg', 'Unknown error')}")
 
         return data.get("object", {}).get("dataList", [])
 
+    def fetch_list(
+        self,
+        lmid: str = "all",
+        page: int = 1,
+        page_size: int = 30,
+    ) -> list[dict[str, Any]]:
+        """Fetch the list of information items.
+
+        Args:
+            lmid: Column ID (default "all" for all columns)
+            page: Page number (1-indexed)
+            page_size: Number of items per page (default 30)
+
+        Returns:
+            List of information items.
+        """
+        return self._parse_list(self._post_list(lmid, page, page_size))
+
+    def fetch_list_if_changed(
+        self,
+        lmid: str = "all",
+        page: int = 1,
+        page_size: int = 30,
+    ) -> list[dict[str, Any]] | None:
+        """Fetch the list of information items unless the page is unchanged.
+
+        The list API is a POST and sends no ETag or Last-Modified, so a digest of the
+        previous response body for the same page stands in for those validators. The
+        digest only counts once mark_lists_processed() is called, so a page whose
+        processing failed is returned again on the next call.
+
+        Args:
+            lmid: Column ID (default "all" for all columns)
+            page: Page number (1-indexed)
+            page_size: Number of items per page (default 30)
+
+        Returns:
+            List of information items, or None if the page is identical to the last fetch.
+        """
+        response = self._post_list(lmid, page, page_size)
+        key = (lmid, page, page_size)
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if self._list_digests.get(key) == digest:
+            return None
+
+        items = self._parse_list(response)
+        self._pending_list_digests[key] = digest
+        return items
+
+    def mark_lists_processed(self) -> None:
+        """Remember the list pages fetched with fetch_list_if_changed() as processed.
+
+        Call after their items have been stored; until then an unchanged page is
+        still returned so a failed run is retried.
+        """
+        self._list_digests.update(self._pending_list_digests)
+        self._pending_list_digests.clear()
+
     def fetch_detail(self, xxid: str) -> dict[str, Any]:
         """Fetch the detail page for an information item and parse full content.
 
@@ -226,20 +350,20 @@ class InfoTsinghuaScraper:
 
         return all_items
 
-    def upsert_article(self, item: dict[str, Any], fetch_content: bool = True) -> ArticleStateEnum:
-        """Insert or update an article from a list item.
+    def build_article(self, item: dict[str, Any], fetch_content: bool = True) -> dict[str, Any]:
+        """Build a validated article dictionary from a list item.
 
         Args:
             item: List item dictionary from the API
             fetch_content: Whether to fetch full article content (default: True)
 
         Returns:
-            ArticleStateEnum indicating if article was new, updated, or skipped
+            Article dictionary ready for database insertion
 
         Raises:
-            ValueError: If required fields are missing from the item
+            ValueError: If required fields are missing from the item or are invalid
         """
-        from database import upsert_article as db_upsert
+        from database import validate_article
 
         # Validate required fields
         required_fields = ["xxid", "bt", "fbsj", "url"]
@@ -285,13 +409,43 @@ class InfoTsinghuaScraper:
                         "content": detail.get("content", ""),
                     }
                 )
-                logger.debug(f"Fetched full content for {item['xxid']}")
+                logger.debug("Fetched full content for %s", item["xxid"])
             except Exception as e:
-                logger.warning(f"Failed to fetch full content for {item['xxid']}: {e}")
+                logger.warning("Failed to fetch full content for %s: %s", item["xxid"], e)
+                self.failed_details += 1
                 # Continue with basic article info
 
-        state = db_upsert(article)
-        return ArticleStateEnum(state)
+        validate_article(article)
+        return article
+
+    def upsert_articles_bulk(
+        self, items: list[dict[str, Any]], fetch_content: bool = True
+    ) -> tuple[list[ArticleStateEnum], int]:
+        """Insert or update a batch of list items in a single database transaction.
+
+        Invalid items are logged and skipped before anything is written.
+
+        Args:
+            items: List item dictionaries from the API
+            fetch_content: Whether to fetch full article content (default: True)
+
+        Returns:
+            Tuple of (states of the stored articles, number of skipped invalid items)
+        """
+        from database import upsert_articles as db_upsert_many
+
+        articles = []
+        error_count = 0
+        for item in items:
+            try:
+                articles.append(self.build_article(item, fetch_content=fetch_content))
+            except (ValueError, KeyError) as e:
+                # Skip items with missing required fields
+                error_count += 1
+                logger.warning("Skipping item %s due to error: %s", item.get("xxid", "UNKNOWN"), e)
+
+        states = [ArticleStateEnum(state) for state in db_upsert_many(articles)]
+        return states, error_count
 
     @staticmethod
     def parse_timestamp(timestamp_ms: int) -> datetime:
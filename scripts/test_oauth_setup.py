@@ -74,26 +74,6 @@ def check_database() -> bool:
                 print("  ❌ users table missing")
                 return False
 
-            # Check auth_tokens table
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='auth_tokens'"
-            )
-            if cursor.fetchone():
-                print("  ✓ auth_tokens table exists")
-            else:
-                print("  ❌ auth_tokens table missing")
-                return False
-
-            # Check rate_limit_tracking table
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='rate_limit_tracking'"
-            )
-            if cursor.fetchone():
-                print("  ✓ rate_limit_tracking table exists")
-            else:
-                print("  ❌ rate_limit_tracking table missing")
-                return False
-
         print("\n✓ Database tables are ready")
         return True
 
@@ -120,18 +100,13 @@ def print_usage_instructions() -> None:
     print("\n3. After authentication, you'll receive a token")
 
     print("\n4. Access the RSS feed:")
-    print("   curl -H 'X-API-Token: YOUR_TOKEN' http://localhost:8000/rss")
-    print("   # or")
     print("   curl 'http://localhost:8000/rss?token=YOUR_TOKEN'")
 
-    print("\n5. Manage tokens:")
-    print("   # List tokens")
-    print("   curl -H 'X-API-Token: YOUR_TOKEN' http://localhost:8000/auth/tokens")
-    print("\n   # Create new token")
-    print("   curl -X POST -H 'X-API-Token: YOUR_TOKEN' \\")
-    print("        -H 'Content-Type: application/json' \\")
-    print('        -d \'{"name": "My RSS Reader"}\' \\')
-    print("        http://localhost:8000/auth/tokens")
+    print("\n5. Manage your token:")
+    print("   # Show token info")
+    print("   curl 'http://localhost:8000/auth/tokens?token=YOUR_TOKEN'")
+    print("\n   # Rotate token (the old one stops working)")
+    print("   curl -X POST 'http://localhost:8000/auth/tokens/YOUR_TOKEN/rotate'")
 
     print("\n6. Rate limits:")
     print("   - 1 request per second")